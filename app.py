@@ -4,13 +4,18 @@
 
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-import requests
-import base64
 from datetime import datetime
 import time
+import html
+import io
 import json
+import os
+import random
+import re
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # ====================
 # 1. 設定區 (Configuration)
@@ -26,62 +31,355 @@ SCOPE = [
     "https://www.googleapis.com/auth/spreadsheets",
 ]
 
+# 本機開發用的服務帳戶金鑰檔 (未設定 st.secrets 時使用)
+SERVICE_ACCOUNT_FILE = "service_account.json"
+
+# 試算表讀入的欄位型別 (pyarrow 隨 streamlit 一起安裝)
+STRING_DTYPE = "string[pyarrow]"
+
+# 試算表資料快取秒數
+DATA_TTL = 60
+
+# 寫入試算表遇到流量限制 (429) 或伺服器錯誤時的最多嘗試次數
+SHEETS_WRITE_ATTEMPTS = 5
+
+# records 工作表欄位範圍 (A~G，與送出時寫入的欄位順序一致；C 欄為會議日期)
+RECORDS_LAST_COL = "G"
+RECORDS_HEADER_RANGE = f"records!A1:{RECORDS_LAST_COL}1"
+RECORDS_DATE_RANGE = "records!C2:C"
+
+# 從 Google Drive / Docs 連結取出檔案 ID (支援 ?id=xxx 與 /file/d/xxx/ 兩種格式；其他網站的連結不比對)
+_DRIVE_ID_RE = re.compile(
+    r'^https?://(?:drive|docs)\.google\.com/[^?#\s]*?(?:/d/|\?(?:[^#\s]*&)?id=)([A-Za-z0-9_-]{10,})'
+)
+
+DRIVE_THUMBNAIL_URL = "https://drive.google.com/thumbnail?id="
+
+# 上傳前壓縮照片：長邊上限 (像素) 與 JPEG 品質
+IMAGE_MAX_SIDE = 1920
+IMAGE_JPEG_QUALITY = 85
+RESIZABLE_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+# 同時上傳附件的最大執行緒數
+MAX_UPLOAD_WORKERS = 8
+
+# GAS 上傳請求逾時秒數 (連線, 讀取)
+GAS_TIMEOUT = (5, 60)
+
+# 上傳內容是否以 gzip 壓縮 (Content-Encoding: gzip)
+# 開啟前 GAS 端須先改為解壓縮：Utilities.ungzip(Utilities.newBlob(...)).getDataAsString()
+GAS_GZIP_UPLOAD = False
+
 # ====================
 # 2. 核心功能函式庫
 # ====================
 
+@st.cache_resource
+def load_credentials():
+    """讀取服務帳戶憑證 (憑證物件快取)；找不到設定時回傳 None"""
+    # 較重的 Google 函式庫延後到第一次連線時才載入，加快冷啟動
+    from google.oauth2.service_account import Credentials
+
+    try:
+        has_secret = "gcp_service_account" in st.secrets
+    except FileNotFoundError:
+        # 沒有 secrets.toml (或無法解析) 時 st.secrets 會丟出 StreamlitSecretNotFoundError
+        # (FileNotFoundError 的子類別)，改用本機金鑰檔
+        has_secret = False
+
+    if has_secret:
+        creds_dict = dict(st.secrets["gcp_service_account"])
+        return Credentials.from_service_account_info(creds_dict, scopes=SCOPE)
+    if os.path.exists(SERVICE_ACCOUNT_FILE):
+        return Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPE)
+    return None
+
 @st.cache_resource
 def init_connection():
     """連線到 Google Sheets (連線物件快取)"""
-    creds = None
-    if "gcp_service_account" in st.secrets:
-        creds_dict = st.secrets["gcp_service_account"]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPE)
-    else:
-        try:
-            creds = Credentials.from_service_account_file("service_account.json", scopes=SCOPE)
-        except:
-            return None
+    import gspread
+
+    creds = load_credentials()
+    if creds is None:
+        return None
     return gspread.authorize(creds)
 
+@st.cache_resource
+def open_sheet(_gc):
+    """開啟試算表 (試算表物件快取，只需開啟一次)"""
+    return _gc.open_by_key(SHEET_ID)
+
 def get_sh(gc):
     """取得試算表物件"""
     try:
-        return gc.open_by_key(SHEET_ID)
+        return open_sheet(gc)
     except Exception as e:
         return None
 
-@st.cache_data(ttl=60)
+def values_to_df(values):
+    """將試算表回傳的二維陣列 (第一列為標題) 轉成 DataFrame
+
+    API 會省略每列結尾的空白儲存格，這裡補齊成與標題同寬。
+    欄位一律使用 Arrow 字串型別 (string[pyarrow])，字串運算走 Arrow 的向量化實作。
+    """
+    if not values:
+        return pd.DataFrame()
+    header = values[0]
+    width = len(header)
+    rows = [row[:width] + [""] * (width - len(row)) for row in values[1:]]
+    return pd.DataFrame(rows, columns=header, dtype=STRING_DTYPE)
+
+def build_config_lookup(df_config):
+    """由 config 表建立登入對照表 {(處室, 組別): 密碼} 與 {處室: [組別]}"""
+    if df_config.empty:
+        return {}, {}
+    auth_table = dict(zip(
+        zip(df_config['department'], df_config['group']),
+        df_config['password'].astype(str)
+    ))
+    groups_by_dept = {}
+    for dept, group in zip(df_config['department'], df_config['group']):
+        groups_by_dept.setdefault(dept, []).append(group)
+    return auth_table, groups_by_dept
+
+def row_ranges(row_numbers):
+    """將列號合併成連續區段，例如 [2, 3, 4, 7] → ["records!A2:G4", "records!A7:G7"]"""
+    ranges = []
+    start = prev = None
+    for n in row_numbers:
+        if prev is not None and n == prev + 1:
+            prev = n
+            continue
+        if start is not None:
+            ranges.append(f"records!A{start}:{RECORDS_LAST_COL}{prev}")
+        start = prev = n
+    if start is not None:
+        ranges.append(f"records!A{start}:{RECORDS_LAST_COL}{prev}")
+    return ranges
+
+def parse_meeting_dates(values):
+    """將會議日期字串轉成 date；無效日期為 NaT
+
+    每格各自判斷格式 (手動輸入的 2024/5/8 與程式寫入的 2024-05-08 並存)，只略過真正無效的日期。
+    """
+    return pd.to_datetime(
+        pd.Series(list(values), dtype=object), format="mixed", errors='coerce'
+    ).dt.date
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
 def load_data_frames(_gc):
-    """讀取資料 (快取 60 秒)"""
+    """讀取登入對照表與紀錄的日期索引 (快取 60 秒)
+
+    records 只讀取「會議日期」一欄，回傳依日期新→舊排序的 {日期: (列號, ...)}，
+    實際內容等使用者選定日期後再由 load_daily_records 讀取。
+    最後一個回傳值為實際向試算表讀取的時間 (time.time())。
+    """
     try:
-        sh = _gc.open_by_key(SHEET_ID)
-        ws_config = sh.worksheet("config")
-        df_config = pd.DataFrame(ws_config.get_all_records())
-        ws_records = sh.worksheet("records")
-        df_records = pd.DataFrame(ws_records.get_all_records())
-        return df_config, df_records
+        sh = open_sheet(_gc)
+        # config 整張與 records 日期欄一次 batchGet 取回 (1 次 API 呼叫)
+        config_range, date_range = sh.values_batch_get(["config", RECORDS_DATE_RANGE])["valueRanges"]
+        df_config = values_to_df(config_range.get("values", []))
+        auth_table, groups_by_dept = build_config_lookup(df_config)
+
+        date_values = date_range.get("values", [])
+        dates = parse_meeting_dates([v[0] if v else "" for v in date_values])
+        record_dates = {}
+        for row_no, d in enumerate(dates, start=2):
+            if pd.notna(d):
+                record_dates.setdefault(d, []).append(row_no)
+        # 排序只在載入時做一次，看板直接依序列出
+        record_dates = {d: tuple(rows) for d, rows in sorted(record_dates.items(), reverse=True)}
+        return auth_table, groups_by_dept, record_dates, time.time()
     except Exception as e:
-        return None, None
+        return None, None, None, None
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def load_daily_records(_gc, meeting_date, row_numbers):
+    """只讀取指定列號的紀錄 (一次 batchGet，快取 60 秒)
+
+    回傳 (依處室分組的 {處室: [紀錄 dict, ...]}, 日期索引是否已過時)，看板直接依序走訪，不需再做 pandas 篩選。
+    列號來自較早讀取的日期索引；若試算表之後被手動排序或刪列，列號會對到別的紀錄，
+    因此取回後仍以實際的 meeting_date 過濾，並回報索引已過時。
+    """
+    try:
+        sh = open_sheet(_gc)
+        result = sh.values_batch_get([RECORDS_HEADER_RANGE] + row_ranges(row_numbers))
+        value_ranges = result.get("valueRanges", [])
+        header = value_ranges[0]["values"][:1]
+        rows = [row for vr in value_ranges[1:] for row in vr.get("values", [])]
+        df = values_to_df(header + rows)
+        matches = (parse_meeting_dates(df['meeting_date']) == meeting_date).to_numpy()
+        index_stale = len(df) != len(row_numbers) or not matches.all()
+        df = df[matches].copy()
+        df['image_url'] = df['image_url'].str.strip()
+        # 一次向量化組出所有 Drive 附件的縮圖網址 (非 Drive 連結為 NaN)，顯示時直接讀欄位
+        drive_ids = df['image_url'].str.extract(_DRIVE_ID_RE, expand=False)
+        df['thumbnail_url'] = DRIVE_THUMBNAIL_URL + drive_ids + "&sz=w800"
+
+        board = {}
+        for row in df[['department', 'group', 'content', 'image_url', 'thumbnail_url']].to_dict('records'):
+            board.setdefault(row.pop('department'), []).append(row)
+        return board, index_stale
+    except Exception as e:
+        return None, False
+
+def load_if_stale(gc):
+    """取得登入對照表與日期索引，結果存在 session_state，DATA_TTL 秒內直接讀取
 
-def upload_file_via_gas(file_obj):
+    st.cache_data 每次命中都要反序列化一份複本；存在 session_state 後，
+    同一使用者的重新執行只是讀取屬性。過期時仍經由 load_data_frames 的共用快取讀取。
+    _data_ts 記錄的是資料實際讀取的時間 (非本 session 取用快取的時間)，資料最多只會舊 DATA_TTL 秒。
+    """
+    if st.session_state.get('_data_ts', 0) + DATA_TTL < time.time():
+        *data, fetched_at = load_data_frames(gc)
+        if data[0] is None:
+            return data
+        st.session_state._data = data
+        st.session_state._data_ts = fetched_at
+    return st.session_state._data
+
+def clear_data_cache():
+    """清除試算表資料快取 (共用快取與本 session 的副本)"""
+    load_data_frames.clear()
+    load_daily_records.clear()
+    st.session_state.pop('_data_ts', None)
+
+def append_rows_with_retry(ws, rows):
+    """批次寫入多列；遇到 429 / 5xx 以指數退避 + 隨機抖動重試
+
+    只重試寫入這一步，已上傳的附件連結不會因流量限制而需要重新上傳。
+    """
+    from gspread.exceptions import APIError
+
+    for attempt in range(SHEETS_WRITE_ATTEMPTS):
+        try:
+            return ws.append_rows(rows, value_input_option="RAW", insert_data_option="INSERT_ROWS")
+        except APIError as e:
+            status = e.response.status_code
+            if attempt == SHEETS_WRITE_ATTEMPTS - 1 or not (status == 429 or status >= 500):
+                raise
+            time.sleep(min(2 ** (attempt + 1), 30) + random.uniform(0, 1))
+
+@st.cache_resource(show_spinner=False)
+def get_gas_session():
+    """取得所有上傳共用的 requests.Session (連線物件快取)
+
+    Streamlit 每次重新執行都會重跑整個腳本，模組層級的物件留不住，
+    因此以 cache_resource 保存，讓 keep-alive 連線能跨次送出重複使用 (避免每次重新 TLS 握手)。
+    上傳執行緒只做單純的 POST，urllib3 的連線池本身是執行緒安全的。
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    # 只重試「連線失敗」：此時請求尚未送出，重送不會造成重複上傳，
+    # 且上傳內容是串流 (UploadBody)，送出後無法倒帶重送
+    retry = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5)
+    # 連線池大小與上傳執行緒數一致，平行上傳時每個執行緒都能拿到可重複使用的連線
+    session.mount("https://", HTTPAdapter(
+        pool_connections=MAX_UPLOAD_WORKERS, pool_maxsize=MAX_UPLOAD_WORKERS, max_retries=retry
+    ))
+    return session
+
+class UploadBody:
+    """以串流方式產生 GAS 所需的 JSON 內容 {"file", "filename", "mimeType"}
+
+    檔案內容 (bytes) 每次只取一小段做 base64 編碼，不需在記憶體中保留整份 base64 / JSON 複本。
+    requests 會依 __len__ 設定 Content-Length，並透過 read() 分段送出。
+    """
+    # 3 的倍數，分段編碼的 base64 結果才能直接串接
+    CHUNK_SIZE = 3 * 64 * 1024
+
+    def __init__(self, data, filename, mime_type):
+        self._data = data
+        size = len(data)
+        self._head = b'{"file": "'
+        self._tail = (
+            f'", "filename": {json.dumps(filename)}, "mimeType": {json.dumps(mime_type)}}}'
+        ).encode('utf-8')
+        self._length = len(self._head) + 4 * ((size + 2) // 3) + len(self._tail)
+        self._chunks = self._iter_chunks()
+        self._buffer = b""
+        self._pos = 0
+
+    def _iter_chunks(self):
+        import base64
+        yield self._head
+        # 對 bytes 取 memoryview 切片交給 b64encode，分段時不再複製原始位元組
+        # (不可用 BytesIO.getbuffer()：共用 bytes 的 BytesIO 會先整份複製)
+        with memoryview(self._data) as view:
+            for start in range(0, len(view), self.CHUNK_SIZE):
+                yield base64.b64encode(view[start:start + self.CHUNK_SIZE])
+        yield self._tail
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer[self._pos:] + b"".join(self._chunks)
+            self._buffer, self._pos = b"", 0
+            return data
+        while len(self._buffer) - self._pos < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer, self._pos = self._buffer[self._pos:] + chunk, 0
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+def shrink_image(file_bytes, filename, mime_type):
+    """將照片縮到長邊 IMAGE_MAX_SIDE 並轉成 JPEG，回傳 (檔案內容, 檔名, MIME)
+
+    非照片、無法處理或壓縮後反而更大時，原樣回傳。
+    """
+    if mime_type not in RESIZABLE_IMAGE_TYPES:
+        return file_bytes, filename, mime_type
+    try:
+        from PIL import Image, ImageOps
+
+        im = Image.open(io.BytesIO(file_bytes))
+        if im.mode in ("RGBA", "LA", "P"):
+            # 調色盤 / 透明圖先轉 RGBA 再縮，否則 P 模式縮圖只能用 NEAREST，字與線條會鋸齒
+            im = im.convert("RGBA")
+        # 先縮圖再轉正：JPEG 可直接以縮小尺寸解碼 (draft)，不需先解出整張原圖；
+        # 限制框為正方形，轉向前後縮出的尺寸相同
+        im.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+        im = ImageOps.exif_transpose(im)
+        if im.mode == "RGBA":
+            # 透明背景改鋪白底
+            background = Image.new("RGB", im.size, (255, 255, 255))
+            background.paste(im, mask=im.getchannel("A"))
+            im = background
+        buf = io.BytesIO()
+        im.convert("RGB").save(buf, "JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+    except Exception:
+        return file_bytes, filename, mime_type
+
+    if buf.tell() >= len(file_bytes):
+        return file_bytes, filename, mime_type
+    return buf.getvalue(), filename.rsplit(".", 1)[0] + ".jpg", "image/jpeg"
+
+def upload_file_via_gas(file_bytes, filename, mime_type):
     """透過 GAS 中繼站上傳檔案 (v2.4 強力除錯版)"""
-    if file_obj is None:
+    if not file_bytes:
         return ""
     
     try:
-        # 1. 準備資料
-        file_content = file_obj.getvalue()
-        base64_str = base64.b64encode(file_content).decode('utf-8')
-        
-        payload = {
-            "file": base64_str,
-            "filename": file_obj.name,
-            "mimeType": file_obj.type
-        }
+        # 1. 準備資料 (照片先縮圖，再串流編碼，不在記憶體中組出整份 base64 / JSON)
+        file_bytes, filename, mime_type = shrink_image(file_bytes, filename, mime_type)
+        body = UploadBody(file_bytes, filename, mime_type)
         
         # 2. 發送請求
-        response = requests.post(GAS_UPLOAD_URL, json=payload)
+        headers = None
+        if GAS_GZIP_UPLOAD:
+            import gzip
+            body = gzip.compress(body.read(), compresslevel=6)
+            headers = {"Content-Encoding": "gzip"}
+        response = get_gas_session().post(GAS_UPLOAD_URL, data=body, headers=headers, timeout=GAS_TIMEOUT)
         
         # 3. 解析回應 (這裡最容易出錯，我們加上保護機制)
         try:
@@ -105,6 +403,44 @@ def upload_file_via_gas(file_obj):
 # 3. 介面邏輯 (UI Logic)
 # ====================
 
+def lazy_image(url, caption):
+    """以 <img loading="lazy"> 顯示圖片：由瀏覽器直接向來源延遲載入，不經 Streamlit 轉送"""
+    src = html.escape(url, quote=True)
+    st.markdown(
+        f'<figure style="margin:0"><img src="{src}" loading="lazy" style="max-width:100%">'
+        f'<figcaption style="font-size:0.85em;color:gray">{html.escape(caption)}</figcaption></figure>',
+        unsafe_allow_html=True
+    )
+
+@st.fragment
+def login_sidebar(auth_table, groups_by_dept):
+    """側邊欄登入區 (fragment：切換選單、輸入密碼只重跑這一區)"""
+    st.title("🏫 功能選單")
+    if not st.session_state.logged_in:
+        st.subheader("使用者登入")
+        if groups_by_dept:
+            selected_dept = st.selectbox("選擇處室", list(groups_by_dept))
+            selected_group = st.selectbox("選擇組別", groups_by_dept[selected_dept])
+            password = st.text_input("密碼", type="password")
+            
+            if st.button("登入"):
+                if auth_table.get((selected_dept, selected_group)) == str(password):
+                    st.session_state.logged_in = True
+                    st.session_state.user_info = {'dept': selected_dept, 'group': selected_group}
+                    st.success("登入成功！")
+                    time.sleep(0.5)
+                    st.rerun()
+                else:
+                    st.error("密碼錯誤")
+    else:
+        st.info(f"Hi, {st.session_state.user_info['dept']} - {st.session_state.user_info['group']}")
+        if st.button("登出"):
+            st.session_state.logged_in = False
+            st.session_state.user_info = {}
+            st.session_state.cart = []
+            st.session_state.cart_view = []
+            st.rerun()
+
 def main():
     st.set_page_config(page_title="校務會議看板", layout="wide", page_icon="🏫")
     
@@ -115,52 +451,22 @@ def main():
         return
 
     # 讀取資料
-    df_config, df_records = load_data_frames(gc)
-    if df_config is None:
+    auth_table, groups_by_dept, record_dates = load_if_stale(gc)
+    if auth_table is None:
         st.error("❌ 無法讀取資料，請檢查 Sheet ID。")
+        # 最常見的原因是試算表尚未共用給服務帳戶，直接顯示要共用的帳號
+        bot_email = getattr(load_credentials(), "service_account_email", None)
+        if bot_email:
+            st.info(f"請確認試算表已共用 (編輯者) 給服務帳戶：{bot_email}")
         return
 
     # Session State
-    if 'logged_in' not in st.session_state:
-        st.session_state.logged_in = False
-    if 'user_info' not in st.session_state:
-        st.session_state.user_info = {}
-    if 'cart' not in st.session_state:
-        st.session_state.cart = [] 
+    for key, default in (('logged_in', False), ('user_info', {}), ('cart', []), ('cart_view', [])):
+        st.session_state.setdefault(key, default)
 
     # --- 側邊欄 ---
     with st.sidebar:
-        st.title("🏫 功能選單")
-        if not st.session_state.logged_in:
-            st.subheader("使用者登入")
-            if not df_config.empty:
-                dept_list = df_config['department'].unique().tolist()
-                selected_dept = st.selectbox("選擇處室", dept_list)
-                groups_in_dept = df_config[df_config['department'] == selected_dept]['group'].tolist()
-                selected_group = st.selectbox("選擇組別", groups_in_dept)
-                password = st.text_input("密碼", type="password")
-                
-                if st.button("登入"):
-                    valid_user = df_config[
-                        (df_config['department'] == selected_dept) & 
-                        (df_config['group'] == selected_group) & 
-                        (df_config['password'].astype(str) == str(password))
-                    ]
-                    if not valid_user.empty:
-                        st.session_state.logged_in = True
-                        st.session_state.user_info = {'dept': selected_dept, 'group': selected_group}
-                        st.success("登入成功！")
-                        time.sleep(0.5)
-                        st.rerun()
-                    else:
-                        st.error("密碼錯誤")
-        else:
-            st.info(f"Hi, {st.session_state.user_info['dept']} - {st.session_state.user_info['group']}")
-            if st.button("登出"):
-                st.session_state.logged_in = False
-                st.session_state.user_info = {}
-                st.session_state.cart = []
-                st.rerun()
+        login_sidebar(auth_table, groups_by_dept)
 
     # --- 主畫面 ---
     tab1, tab2 = st.tabs(["📋 看板", "📝 繕打"])
@@ -169,30 +475,38 @@ def main():
     with tab1:
         st.header("每週會議紀錄彙整")
         if st.button("🔄 重新整理"):
-            st.cache_data.clear()
+            clear_data_cache()
             st.rerun()
 
-        if not df_records.empty:
-            df_records['meeting_date'] = pd.to_datetime(df_records['meeting_date']).dt.date
-            all_dates = sorted(df_records['meeting_date'].unique(), reverse=True)
-            selected_date = st.selectbox("選擇會議日期", all_dates)
+        if record_dates:
+            selected_date = st.selectbox("選擇會議日期", list(record_dates))
             st.divider()
             
-            daily_records = df_records[df_records['meeting_date'] == selected_date]
-            if not daily_records.empty:
-                departments = daily_records['department'].unique()
-                for dept in departments:
+            daily_records, index_stale = load_daily_records(gc, selected_date, record_dates[selected_date])
+            if index_stale:
+                # 試算表已被排序或刪列，清除快取讓下次重新執行重建日期索引
+                clear_data_cache()
+            if daily_records is None:
+                st.error("❌ 無法讀取該日期的紀錄。")
+            elif daily_records:
+                for dept, rows in daily_records.items():
                     st.subheader(f"📂 {dept}")
-                    dept_data = daily_records[daily_records['department'] == dept]
-                    for idx, row in dept_data.iterrows():
-                        with st.expander(f"{row['group']} - {str(row['content'])[:20]}...", expanded=True):
-                            st.markdown(f"**報告內容：**\n{row['content']}")
-                            if row['image_url'] and str(row['image_url']).strip() != "":
+                    for row in rows:
+                        content_str = str(row['content'])
+                        image_url = row['image_url']
+                        thumbnail_url = row['thumbnail_url']
+                        # 預設收合，未展開的紀錄不會先載入附件圖片
+                        with st.expander(f"{row['group']} - {content_str[:20]}...", expanded=False):
+                            st.markdown(f"**報告內容：**\n{content_str}")
+                            if image_url:
                                 # 嘗試顯示圖片，如果不是圖片格式則顯示下載連結
-                                if any(ext in str(row['image_url']).lower() for ext in ['.jpg', '.jpeg', '.png', '.gif']):
-                                    st.image(row['image_url'], caption="附件圖片", use_container_width=True)
+                                if any(ext in image_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif']):
+                                    lazy_image(image_url, caption="附件圖片")
                                 else:
-                                    st.markdown(f"📎 [點此下載/檢視附件檔案]({row['image_url']})")
+                                    if isinstance(thumbnail_url, str):
+                                        # Drive 檔案改用縮圖預覽
+                                        lazy_image(thumbnail_url, caption="附件預覽")
+                                    st.markdown(f"📎 [點此下載/檢視附件檔案]({image_url})")
                     st.write("---")
             else:
                 st.info("該日期無紀錄")
@@ -217,21 +531,27 @@ def main():
             
             if st.button("➕ 加入暫存"):
                 if new_content:
+                    file_name = uploaded_file.name if uploaded_file else "無附件"
                     st.session_state.cart.append({
                         'content': new_content,
-                        'file': uploaded_file,
-                        'file_name': uploaded_file.name if uploaded_file else "無附件"
+                        # 直接存檔案內容，不保留 Streamlit 元件的 UploadedFile 物件
+                        'file_bytes': uploaded_file.getvalue() if uploaded_file else None,
+                        'file_name': file_name,
+                        'mime': uploaded_file.type if uploaded_file else None
                     })
+                    # 暫存清單的顯示資料同步累加，不必每次重新執行都重組
+                    st.session_state.cart_view.append({'content': new_content, 'file_name': file_name})
                     st.success("已加入")
             
             if st.session_state.cart:
                 st.markdown("### 🛒 暫存清單")
-                st.table(pd.DataFrame(st.session_state.cart)[['content', 'file_name']])
+                st.table(st.session_state.cart_view)
                 
                 col_c, col_s = st.columns([1, 4])
                 with col_c:
                     if st.button("🗑️ 清空"):
                         st.session_state.cart = []
+                        st.session_state.cart_view = []
                         st.rerun()
                 with col_s:
                     if st.button("🚀 確認送出", type="primary"):
@@ -241,26 +561,48 @@ def main():
                             sh = get_sh(gc) 
                             if sh:
                                 ws_records = sh.worksheet("records")
-                                total = len(st.session_state.cart)
-                                for i, item in enumerate(st.session_state.cart):
-                                    status_text.text(f"處理中 {i+1}/{total} (上傳附件中)...")
-                                    link = ""
-                                    if item['file']:
-                                        link = upload_file_via_gas(item['file'])
-                                    
-                                    ws_records.append_row([
-                                        str(hash(item['content'] + str(time.time()))),
-                                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                        str(meeting_date),
-                                        st.session_state.user_info['dept'],
-                                        st.session_state.user_info['group'],
-                                        item['content'],
-                                        link
-                                    ])
-                                    progress_bar.progress((i+1)/total)
+                                cart = st.session_state.cart
+                                total = len(cart)
+
+                                # 平行上傳附件 (網路 I/O 為主，多執行緒可大幅縮短等待)
+                                links = [""] * total
+                                upload_jobs = [(i, item) for i, item in enumerate(cart) if item['file_bytes']]
+                                if upload_jobs:
+                                    ctx = get_script_run_ctx()
+
+                                    def _upload(item):
+                                        # 讓子執行緒也能呼叫 st.error 等元件
+                                        add_script_run_ctx(threading.current_thread(), ctx)
+                                        return upload_file_via_gas(item['file_bytes'], item['file_name'], item['mime'])
+
+                                    done = 0
+                                    status_text.text(f"上傳附件中 0/{len(upload_jobs)}...")
+                                    with ThreadPoolExecutor(max_workers=min(MAX_UPLOAD_WORKERS, len(upload_jobs))) as executor:
+                                        futures = {executor.submit(_upload, item): i for i, item in upload_jobs}
+                                        for future in as_completed(futures):
+                                            links[futures[future]] = future.result()
+                                            done += 1
+                                            status_text.text(f"上傳附件中 {done}/{len(upload_jobs)}...")
+                                            progress_bar.progress(done / len(upload_jobs))
+
+                                # 時間戳記、日期與使用者資訊代表整批送出，只需計算一次
+                                submit_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                meeting_date_str = str(meeting_date)
+                                dept = st.session_state.user_info['dept']
+                                group = st.session_state.user_info['group']
+                                rows_to_write = [
+                                    [uuid.uuid4().hex, submit_ts, meeting_date_str, dept, group, item['content'], link]
+                                    for item, link in zip(cart, links)
+                                ]
+
+                                # 一次批次寫入所有列 (N 次 API 呼叫 → 1 次)
+                                status_text.text("寫入試算表中...")
+                                append_rows_with_retry(ws_records, rows_to_write)
+                                progress_bar.progress(1.0)
                                 st.success("✅ 成功！")
                                 st.session_state.cart = []
-                                st.cache_data.clear()
+                                st.session_state.cart_view = []
+                                clear_data_cache()
                                 time.sleep(2)
                                 st.rerun()
                             else: